@@ -1,21 +1,103 @@
 import argparse
 import collections
+import concurrent.futures
 import datetime
-import json
+import math
+import os
 import sys
+import tempfile
+import threading
 import time
 
+import ijson
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # ---------- Config knobs ----------
-SLEEP_BETWEEN_CALLS = 0.05  # seconds between Sleeper requests to be nice
+MAX_CONCURRENT_REQUESTS = 16  # in-flight Sleeper requests
+MAX_REQUESTS_PER_SEC = 20  # global Sleeper request rate, to be nice
+# Keep-alive connections per host. The peak is the weekly-fetch phase
+# (MAX_CONCURRENT_REQUESTS to Sleeper); uploads to the Worker only start
+# after it and use their own host pool, one connection per position.
+HTTP_POOL_SIZE = MAX_CONCURRENT_REQUESTS
 DEFAULT_POSITIONS = ["WR", "RB", "QB", "TE"]
 SLEEPER_PLAYERS_URL = "https://api.sleeper.com/players/nfl"
-SLEEPER_PLAYER_WEEKLY_URL = (
-    "https://api.sleeper.com/stats/nfl/player/{pid}"
-    "?season={season}&season_type=regular&week={week}"
+# The 32 NFL defenses; totals are a fixed array indexed by TEAM_TO_IDX.
+TEAMS = (
+    "ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE",
+    "DAL", "DEN", "DET", "GB", "HOU", "IND", "JAX", "KC",
+    "LAC", "LAR", "LV", "MIA", "MIN", "NE", "NO", "NYG",
+    "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS",
 )
+TEAM_ALIASES = {"LA": "LAR", "STL": "LAR", "JAC": "JAX", "WSH": "WAS", "OAK": "LV", "SD": "LAC"}
+TEAM_TO_IDX = {t: i for i, t in enumerate(TEAMS)}
+TEAM_TO_IDX.update({alias: TEAM_TO_IDX[t] for alias, t in TEAM_ALIASES.items()})
+
+# Sleeper fields that already carry fantasy points, in preference order.
+POINT_KEYS = (
+    "pts_half_ppr",
+    "fpts_half_ppr",
+    "pts_hppr",
+    "pts_ppr",
+    "pts_std",
+    "fpts",
+)
+# Component columns of extract_stat_row() (after the direct-points column),
+# and the per-scoring coefficient vectors that line up with them.
+STAT_COLUMNS = (
+    "rec", "rec_yd", "rec_td",
+    "rush_yd", "rush_td",
+    "pass_yd", "pass_td",
+    "ints", "fum",
+)
+# Sleeper field aliases for each STAT_COLUMNS entry, in preference order.
+KEY_GROUPS = (
+    ("rec", "receptions"),
+    ("rec_yd", "receiving_yards", "receiving_yds"),
+    ("rec_td", "receiving_tds"),
+    ("rush_yd", "rushing_yards", "rushing_yds"),
+    ("rush_td", "rushing_tds"),
+    ("pass_yd", "passing_yards", "passing_yds"),
+    ("pass_td", "passing_tds"),
+    ("interceptions", "ints"),
+    ("fum_lost", "fumbles_lost", "fum"),
+)
+_YARDS_TDS_TURNOVERS = [0.1, 6, 0.1, 6, 0.04, 4, -2, -2]
+SCORING_COEFS = {
+    "ppr": np.array([1.0] + _YARDS_TDS_TURNOVERS),
+    "half": np.array([0.5] + _YARDS_TDS_TURNOVERS),
+    "std": np.array([0.0] + _YARDS_TDS_TURNOVERS),
+}
+CACHE_DIR = os.path.expanduser("~/.cache/dvp")
+PLAYERS_CACHE_TTL = 24 * 60 * 60  # seconds; roster data changes daily at most
+# The latest N weeks are always refetched, never cached: the through week may
+# still be in progress and the one before can still get stat corrections.
+UNCACHED_RECENT_WEEKS = 2
+SLEEPER_WEEK_STATS_URL = "https://api.sleeper.com/stats/nfl/regular/{season}/{week}"
+
+# One pooled, keep-alive session for every HTTP call (Sleeper + Worker),
+# so we pay the TCP/TLS handshake once per host instead of once per request.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,  # hosts: api.sleeper.com + the Worker
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json",
+})
 
 
 # ---------- helpers ----------
@@ -24,6 +106,29 @@ def log(*args, **kwargs):
     print(*args, **kwargs, flush=True)
 
 
+class RateLimiter:
+    """
+    Thread-safe pacer: hands out one slot every 1/rate seconds, so callers
+    share a global requests-per-second cap regardless of request latency.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+SLEEPER_LIMITER = RateLimiter(MAX_REQUESTS_PER_SEC)
+
+
 def get_current_season():
     return datetime.datetime.now().year
 
@@ -39,14 +144,13 @@ def get_current_week_from_worker(worker_url, season, league_id, s2, swid):
     headers = {
         "X-ESPN-S2": s2,
         "X-ESPN-SWID": swid,
-        "Accept": "application/json",
     }
     params = {"season": str(season), "leagueId": str(league_id)}
 
     log(f"[currentweek] GET {url} season={season} leagueId={league_id}")
-    resp = requests.get(url, headers=headers, params=params, timeout=20)
+    resp = SESSION.get(url, headers=headers, params=params, timeout=20)
     resp.raise_for_status()
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     # 1) Ideal shape
     wk = data.get("currentWeek")
@@ -66,206 +170,326 @@ def get_current_week_from_worker(worker_url, season, league_id, s2, swid):
     raise RuntimeError("Could not determine currentWeek from /currentweek response")
 
 
-def fetch_sleeper_players():
-    log("[players] downloading Sleeper players...")
-    resp = requests.get(SLEEPER_PLAYERS_URL, timeout=60)
-    resp.raise_for_status()
-    players = resp.json()
-    if not isinstance(players, dict):
+def write_cache_file(path, data):
+    """
+    Atomic write (tmp + rename) so a crashed run never leaves a torn cache.
+    Best-effort: on any filesystem error, log it and carry on uncached.
+    """
+    cache_dir = os.path.dirname(path)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log(f"[cache] WARNING: could not write {path}: {e}")
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def fetch_position_index(refresh=False):
+    """
+    Load { fantasy_position: [player_id, ...] } for every Sleeper player.
+    The ~10MB players dump is stream-parsed straight into the index, so the
+    full players dict is never materialized; the (small) index is cached.
+    refresh skips the cached copy (it is still rewritten).
+    """
+    cache_path = os.path.join(CACHE_DIR, "position_index.json")
+    try:
+        age = None if refresh else time.time() - os.path.getmtime(cache_path)
+    except OSError:
+        age = None
+    if age is not None and age < PLAYERS_CACHE_TTL:
+        try:
+            with open(cache_path, "rb") as f:
+                pos_index = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            pos_index = None
+        if isinstance(pos_index, dict) and pos_index:
+            log(f"[players] loaded position index from cache ({int(age)}s old)")
+            return pos_index
+        log("[players] ignoring unusable cached position index; refetching")
+
+    log("[players] streaming Sleeper players...")
+    SLEEPER_LIMITER.wait()
+    resp = SESSION.get(SLEEPER_PLAYERS_URL, stream=True, timeout=60)
+    with resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True  # let urllib3 un-gzip for ijson
+        pos_index = build_position_index(ijson.kvitems(resp.raw, ""))
+    if not pos_index:
         raise RuntimeError("Unexpected Sleeper /players/nfl response shape")
-    log(f"[players] loaded {len(players)} players")
-    return players
+    log(f"[players] indexed {sum(map(len, pos_index.values()))} player positions")
 
+    write_cache_file(cache_path, orjson.dumps(pos_index))
+    return pos_index
 
-def filter_player_ids_by_pos(players, pos):
-    pos = pos.upper()
-    ids = []
-    for pid, p in players.items():
-        fp = p.get("fantasy_positions") or []
-        if isinstance(fp, list) and pos in fp:
-            ids.append(str(pid))
-    log(f"[pos={pos}] candidate players: {len(ids)}")
-    return ids
 
+def build_position_index(player_items):
+    """
+    Invert (player_id, player) pairs once into
+    { fantasy_position: [player_id, ...] } covering every position,
+    so per-position lookups are a dict hit.
+    """
+    idx = collections.defaultdict(list)
+    for pid, p in player_items:
+        for fp in p.get("fantasy_positions") or ():
+            idx[fp].append(str(pid))
+    return dict(idx)
+
+
+def to_float(x):
+    try:
+        return float(x)
+    except Exception:
+        return 0.0
 
-def compute_points(stats, scoring):
+
+def extract_stat_row(stats):
     """
-    Compute fantasy points using:
-      1) direct Sleeper point fields if present
-      2) otherwise from yards/TDs
-    scoring: "half" | "ppr" | "std"
+    Flatten one Sleeper stats dict into a numeric row:
+      [direct_points | nan, rec, rec_yd, rec_td, rush_yd, rush_td,
+       pass_yd, pass_td, ints, fum]
+    direct_points is the first Sleeper point field present; nan means
+    "score it from the components" (see compute_points).
     """
-    def N(x):
-        try:
-            return float(x)
-        except Exception:
-            return 0.0
-
-    # 1) direct point fields if they exist
-    point_keys = (
-        "pts_half_ppr",
-        "fpts_half_ppr",
-        "pts_hppr",
-        "pts_ppr",
-        "pts_std",
-        "fpts",
-    )
-    for k in point_keys:
+    # 1) direct point fields if they exist (first present one wins)
+    direct = math.nan
+    for k in POINT_KEYS:
         v = stats.get(k)
-        if isinstance(v, (int, float)):
-            return float(v)
-
-    # 2) from components
-    rec = stats.get("rec") or stats.get("receptions") or 0
-    rec_yd = (
-        stats.get("rec_yd")
-        or stats.get("receiving_yards")
-        or stats.get("receiving_yds")
-        or 0
-    )
-    rec_td = stats.get("rec_td") or stats.get("receiving_tds") or 0
+        if v is not None:
+            try:
+                direct = float(v)
+                break
+            except (TypeError, ValueError):
+                continue
 
-    rush_yd = (
-        stats.get("rush_yd")
-        or stats.get("rushing_yards")
-        or stats.get("rushing_yds")
-        or 0
-    )
-    rush_td = stats.get("rush_td") or stats.get("rushing_tds") or 0
+    # 2) components: first truthy alias per column, else 0
+    row = [direct]
+    for group in KEY_GROUPS:
+        v = 0
+        for k in group:
+            if k in stats:
+                v = stats[k]
+                if v:
+                    break
+        row.append(to_float(v))
+    return tuple(row)
 
-    pass_yd = (
-        stats.get("pass_yd")
-        or stats.get("passing_yards")
-        or stats.get("passing_yds")
-        or 0
-    )
-    pass_td = stats.get("pass_td") or stats.get("passing_tds") or 0
-
-    ints = stats.get("interceptions") or stats.get("ints") or 0
-    fum = stats.get("fum_lost") or stats.get("fumbles_lost") or stats.get("fum") or 0
-
-    rec = N(rec)
-    rec_yd = N(rec_yd)
-    rec_td = N(rec_td)
-    rush_yd = N(rush_yd)
-    rush_td = N(rush_td)
-    pass_yd = N(pass_yd)
-    pass_td = N(pass_td)
-    ints = N(ints)
-    fum = N(fum)
-
-    if scoring == "ppr":
-        base = 1.0 * rec
-    elif scoring == "half":
-        base = 0.5 * rec
-    else:
-        base = 0.0  # std
-
-    pts = (
-        base
-        + rec_yd / 10.0
-        + 6 * rec_td
-        + rush_yd / 10.0
-        + 6 * rush_td
-        + pass_yd / 25.0
-        + 4 * pass_td
-        - 2 * ints
-        - 2 * fum
-    )
-    return float(pts)
 
+def compute_points(rows, scoring):
+    """
+    Compute fantasy points for a batch of extract_stat_row() rows using:
+      1) direct Sleeper point fields if present
+      2) otherwise from yards/TDs (one matrix-vector product)
+    scoring: "half" | "ppr" | "std"
+    Returns: np.ndarray of points, one per row.
+    """
+    m = np.asarray(rows, dtype=np.float64).reshape(-1, len(STAT_COLUMNS) + 1)
+    direct = m[:, 0]
+    from_components = m[:, 1:] @ SCORING_COEFS[scoring]
+    return np.where(np.isnan(direct), from_components, direct)
 
-def build_dvp_for_pos(pos, season, weeks, scoring, player_ids, max_players=None):
+
+def parse_week_stats(content):
     """
-    For a given position (WR/RB/QB/TE), aggregate fantasy points allowed
-    by defense from Sleeper per-player weekly stats.
-    Returns: (totals_by_defense, stats_dict)
+    Parse a bulk weekly stats body.
+    Returns: (status, rows_by_pid) where status is "ok" | "null" | "err".
     """
-    pos = pos.upper()
-    if max_players:
-        ids = player_ids[:max_players]
-    else:
-        ids = player_ids
+    # Check the raw bytes; only tiny bodies can be empty/null, so big ones
+    # are never decoded or copied by strip().
+    if len(content) <= 8 and content.strip() in (b"", b"null"):
+        return "null", None
 
-    totals = collections.defaultdict(float)
-    calls_ok = calls_err = calls_null = 0
-    rows_pts = rows_opp = 0
+    try:
+        data = orjson.loads(content)
+    except Exception:
+        return "err", None
 
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json",
-    }
+    # Usually keyed by player id; tolerate a list of rows carrying player_id.
+    if isinstance(data, list):
+        data = {
+            str(row.get("player_id")): row
+            for row in data
+            if isinstance(row, dict) and row.get("player_id")
+        }
+    if not isinstance(data, dict):
+        return "err", None
+    return "ok", data
 
-    for pid in ids:
-        for w in weeks:
-            url = SLEEPER_PLAYER_WEEKLY_URL.format(pid=pid, season=season, week=w)
-            try:
-                resp = requests.get(url, headers=headers, timeout=12)
-            except Exception:
-                calls_err += 1
-                continue
 
-            if resp.status_code != 200:
-                calls_err += 1
-                continue
+def fetch_week_stats(season, week, use_cache=False, refresh=False):
+    """
+    Fetch every player's stats row for one week from Sleeper's bulk endpoint.
+    With use_cache (for weeks that are over), a valid non-empty response is
+    kept on disk and reused by later runs instead of being fetched again;
+    refresh skips the cached copy but still rewrites it.
+    Returns: (status, rows_by_pid) where status is "ok" | "null" | "err".
+    """
+    cache_path = os.path.join(CACHE_DIR, "stats", str(season), f"{week}.json")
+    if use_cache and not refresh:
+        try:
+            with open(cache_path, "rb") as f:
+                status, data = parse_week_stats(f.read())
+        except OSError:
+            status, data = "miss", None
+        if status == "ok" and data:
+            log(f"[week={week}] loaded stats from cache")
+            return status, data
+        if status != "miss":
+            log(f"[week={week}] ignoring unusable cached stats; refetching")
+
+    url = SLEEPER_WEEK_STATS_URL.format(season=season, week=week)
+    SLEEPER_LIMITER.wait()
+    try:
+        resp = SESSION.get(url, timeout=30)
+    except Exception:
+        return "err", None
 
-            calls_ok += 1
-            text = resp.text.strip()
-            if not text or text == "null":
-                calls_null += 1
-                continue
+    if resp.status_code != 200:
+        return "err", None
 
-            try:
-                row = resp.json()
-            except Exception:
-                calls_err += 1
-                continue
+    status, data = parse_week_stats(resp.content)
+    # Only cache what is worth reusing: a well-formed week with rows in it.
+    if use_cache and status == "ok" and data:
+        write_cache_file(cache_path, resp.content)
+    return status, data
 
-            if not isinstance(row, dict):
-                continue
 
-            stats = (
-                row.get("stats")
-                if isinstance(row.get("stats"), dict)
-                else row  # some shapes are flat
-            )
-            if not isinstance(stats, dict):
-                continue
+def build_dvp_for_positions(positions, season, weeks, scoring, pos_index, max_players=None, refresh_cache=False):
+    """
+    For the given positions (WR/RB/QB/TE), aggregate fantasy points allowed
+    by defense from Sleeper bulk weekly stats. Each week is fetched and
+    scored once, then scattered to every position its players belong to.
+    Returns: (totals, infos) where totals[i] lines up with TEAMS for
+    positions[i] and infos is { pos: stats_dict }.
+    """
+    positions = [pos.upper() for pos in positions]
+    pid_to_pos_idx = collections.defaultdict(list)
+    players_used = []
+    for i, pos in enumerate(positions):
+        ids = pos_index.get(pos, [])
+        if max_players:
+            ids = ids[:max_players]
+        players_used.append(len(ids))
+        for pid in ids:
+            pid_to_pos_idx[pid].append(i)
+
+    # Scored rows as flat (position, team) cell ids + points, per week;
+    # summed per cell with one bincount at the end.
+    cell_chunks = []
+    pts_chunks = []
+    rows_unknown_opp = np.zeros(len(positions), dtype=np.int64)
+    calls_ok = calls_err = calls_null = 0
+
+    n_workers = max(1, min(MAX_CONCURRENT_REQUESTS, len(weeks)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_workers) as pool:
+        # Older weeks are final; the most recent ones are always refetched.
+        last_cacheable = max(weeks, default=0) - UNCACHED_RECENT_WEEKS
 
-            opp = (
-                row.get("opponent")
-                or row.get("opp")
-                or row.get("opponent_team")
-                or row.get("opp_abbr")
-                or ""
+        def fetch_relevant(w):
+            # Trim to our players in the worker, so pending results don't
+            # each hold a whole-league week dict.
+            status, data = fetch_week_stats(
+                season, w, use_cache=w <= last_cacheable, refresh=refresh_cache
             )
-            opp = str(opp).upper()
-            if not opp:
-                continue
+            if status == "ok":
+                data = {pid: row for pid, row in data.items() if pid in pid_to_pos_idx}
+            return status, data
+
+        results = pool.map(fetch_relevant, weeks)
+
+        # Local bindings for the per-row hot loop.
+        get_pos_idxs = pid_to_pos_idx.get
+        get_team_idx = TEAM_TO_IDX.get
 
-            pts = compute_points(stats, scoring)
-            if pts <= 0:
+        for status, data in results:
+            if status == "err":
+                calls_err += 1
                 continue
 
-            rows_pts += 1
-            rows_opp += 1
-            totals[opp] += pts
+            calls_ok += 1
+            if status == "null":
+                calls_null += 1
+                continue
 
-            time.sleep(SLEEP_BETWEEN_CALLS)
+            week_rows = []
+            week_team_idx = []
+            week_pos_idx = []
+            add_row = week_rows.append
+            add_team = week_team_idx.append
+            add_pos = week_pos_idx.append
+            for pid, row in data.items():
+                pos_idxs = get_pos_idxs(pid)
+                if not pos_idxs:
+                    continue
+                if not isinstance(row, dict):
+                    continue
+
+                stats = row.get("stats")
+                if not isinstance(stats, dict):
+                    stats = row  # some shapes are flat
+
+                opp = (
+                    row.get("opponent")
+                    or row.get("opp")
+                    or row.get("opponent_team")
+                    or row.get("opp_abbr")
+                    or ""
+                )
+                opp = str(opp).upper()
+                if not opp:
+                    continue
+                team_idx = get_team_idx(opp)
+                if team_idx is None:
+                    rows_unknown_opp[pos_idxs] += 1
+                    continue
+
+                stat_row = extract_stat_row(stats)
+                for i in pos_idxs:  # multi-position players count for each
+                    add_row(stat_row)
+                    add_team(team_idx)
+                    add_pos(i)
+
+            if not week_rows:
+                continue
 
-    info = {
-        "calls_ok": calls_ok,
-        "calls_err": calls_err,
-        "calls_null": calls_null,
-        "rows_with_pts": rows_pts,
-        "rows_with_opp": rows_opp,
-        "players_used": len(ids),
+            # Score the whole week at once; drop zero/negative rows.
+            pts = compute_points(week_rows, scoring)
+            keep = pts > 0
+            cells = np.asarray(week_pos_idx) * len(TEAMS) + np.asarray(week_team_idx)
+            cell_chunks.append(cells[keep])
+            pts_chunks.append(pts[keep])
+
+    n_cells = len(positions) * len(TEAMS)
+    cells = np.concatenate(cell_chunks) if cell_chunks else np.zeros(0, dtype=np.intp)
+    pts = np.concatenate(pts_chunks) if pts_chunks else np.zeros(0)
+    totals = np.bincount(cells, weights=pts, minlength=n_cells).reshape(len(positions), len(TEAMS))
+    rows_pts = np.bincount(cells // len(TEAMS), minlength=len(positions))
+
+    infos = {
+        pos: {
+            "calls_ok": calls_ok,
+            "calls_err": calls_err,
+            "calls_null": calls_null,
+            "rows_with_pts": int(rows_pts[i]),
+            "rows_with_opp": int(rows_pts[i]),
+            "rows_unknown_opp": int(rows_unknown_opp[i]),
+            "players_used": players_used[i],
+        }
+        for i, pos in enumerate(positions)
     }
-    return totals, info
+    return totals, infos
 
 
 def make_dvp_doc(pos, season, weeks, scoring, totals, source_tag):
-    items = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+    order = np.argsort(-totals, kind="stable")
+    items = [(TEAMS[i], float(totals[i])) for i in order if totals[i] > 0]
     data = [
         {"rank": i + 1, "team": team, "pointsAllowed": round(pts, 1)}
         for i, (team, pts) in enumerate(items)
@@ -286,16 +510,42 @@ def make_dvp_doc(pos, season, weeks, scoring, totals, source_tag):
 
 def upload_to_worker(worker_url, doc):
     url = f"{worker_url.rstrip('/')}/dvp/cache_put"
-    resp = requests.post(url, json=doc, timeout=60)
+    # Serialize once to bytes and send those as-is; read the reply body
+    # straight off the socket instead of buffering it twice.
+    payload = orjson.dumps(doc)
+    with SESSION.post(
+        url,
+        data=payload,
+        headers={
+            "Content-Type": "application/json",
+            "Content-Length": str(len(payload)),
+        },
+        stream=True,
+        timeout=60,
+    ) as resp:
+        raw = resp.raw.read(decode_content=True)
     try:
-        body = resp.json()
+        body = orjson.loads(raw)
     except Exception:
-        body = {"raw": resp.text[:200]}
+        body = {"raw": raw[:200].decode("utf-8", "replace")}
     if not resp.ok:
-        raise RuntimeError(f"cache_put failed {resp.status}: {body}")
+        raise RuntimeError(f"cache_put failed {resp.status_code}: {body}")
     return body
 
 
+def process_pos(pos, season, weeks, scoring, totals, info, worker_url):
+    """Turn one position's totals into a DvP doc and upload it."""
+    log(f"[{pos}] stats: {info}")
+    if not totals.any():
+        log(f"[{pos}] WARNING: no totals computed, skipping upload.")
+        return None
+
+    doc = make_dvp_doc(pos, season, weeks, scoring, totals, source_tag="Sleeper bulk weekly (external builder)")
+    res = upload_to_worker(worker_url, doc)
+    log(f"[{pos}] uploaded to Worker: {res}")
+    return res
+
+
 def main():
     parser = argparse.ArgumentParser(description="Build DvP for multiple positions and upload to Worker KV.")
     parser.add_argument("--worker-url", required=True, help="Base URL of your Worker, e.g. https://espn-fantasy-proxy.acarvall87.workers.dev")
@@ -307,6 +557,7 @@ def main():
     parser.add_argument("--through", type=int, default=None, help="Override through week (defaults to current fantasy week)")
     parser.add_argument("--positions", default="WR,RB,QB,TE", help="Comma-separated positions to build (default WR,RB,QB,TE)")
     parser.add_argument("--max-players-per-pos", type=int, default=None, help="Optional cap on players per position (for testing / rate limiting)")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached players/weekly stats under ~/.cache/dvp and refetch them (the cache is rewritten)")
 
     args = parser.parse_args()
 
@@ -322,6 +573,7 @@ def main():
     season = args.season or get_current_season()
     positions = [p.strip().upper() for p in args.positions.split(",") if p.strip()]
     max_players = args.max_players_per_pos
+    refresh_cache = args.refresh_cache
 
     # Normalize SWID (Worker expects braces)
     if not swid.startswith("{"):
@@ -342,23 +594,30 @@ def main():
     log(f"[weeks] aggregating weeks {weeks[0]}–{weeks[-1]} (inclusive)")
 
 
-    # 2) Load players once
-    players = fetch_sleeper_players()
+    # 2) Load players once, indexed by position in a single streaming pass
+    pos_index = fetch_position_index(refresh=refresh_cache)
 
-    # 3) Loop positions
+    # 3) Fetch each week once and build every position from it
+    log(f"\n=== Building DvP for pos={','.join(positions)} season={season} scoring={scoring} ===")
     for pos in positions:
-        log(f"\n=== Building DvP for pos={pos} season={season} scoring={scoring} ===")
-        pids = filter_player_ids_by_pos(players, pos)
-        totals, info = build_dvp_for_pos(pos, season, weeks, scoring, pids, max_players=max_players)
-        log(f"[{pos}] stats: {info}")
-        if not totals:
-            log(f"[{pos}] WARNING: no totals computed, skipping upload.")
-            continue
-
-        doc = make_dvp_doc(pos, season, weeks, scoring, totals, source_tag="Sleeper per-player weekly (external builder)")
-        # 4) Upload to Worker
-        res = upload_to_worker(worker_url, doc)
-        log(f"[{pos}] uploaded to Worker: {res}")
+        log(f"[pos={pos}] candidate players: {len(pos_index.get(pos, []))}")
+    totals, infos = build_dvp_for_positions(
+        positions, season, weeks, scoring, pos_index,
+        max_players=max_players, refresh_cache=refresh_cache,
+    )
+
+    # 4) Upload every position to the Worker concurrently (they are independent)
+    n_workers = max(1, len(positions))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_workers) as pool:
+        futures = [
+            pool.submit(
+                process_pos, pos, season, weeks, scoring,
+                totals[i], infos[pos], worker_url,
+            )
+            for i, pos in enumerate(positions)
+        ]
+        for fut in futures:
+            fut.result()  # re-raise the first failure, in position order
 
     log("\nAll positions processed.")
 